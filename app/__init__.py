@@ -6,20 +6,16 @@ This module initializes the Flask application and its extensions.
 
 import os
 from flask import Flask
+from sqlalchemy import event
 from app.config import config
 from app.models import db
-from app.database import init_app as init_db_app
+from app.database import init_app as init_db_app, apply_pragmas
+from app.db_path_helper import verify_users_table
+from app.json_provider import HAS_ORJSON, OrjsonProvider
+from app.utils import hash_pool
+from app.views import register_urls
 import logging
 
-# Try to load .env file if python-dotenv is installed
-try:
-    from dotenv import load_dotenv
-
-    load_dotenv()
-except ImportError:
-    # python-dotenv not installed, continue without it
-    pass
-
 
 def check_database_initialized(app):
     """Check if the database is initialized with required tables."""
@@ -32,24 +28,15 @@ def check_database_initialized(app):
             )
             return False
 
-        with app.app_context():
-            from sqlalchemy import inspect
-            inspector = inspect(db.engine)
-
-            # Print all tables for debugging
-            tables = inspector.get_table_names()
-            app.logger.info(f"Tables found in database: {tables}")
-
-            if not inspector.has_table('users'):
-                app.logger.error(
-                    f"Users table not found in database: {app.config['DATABASE_PATH']}. "
-                    f"Tables found: {tables}. "
-                    "Please run 'python scripts/init_db.py' to initialize the database."
-                )
-                return False
+        if not verify_users_table(app.config['DATABASE_PATH']):
+            app.logger.error(
+                f"Users table not found in database: {app.config['DATABASE_PATH']}. "
+                "Please run 'python scripts/init_db.py' to initialize the database."
+            )
+            return False
 
-            app.logger.info(f"Database initialized successfully with users table: {app.config['DATABASE_PATH']}")
-            return True
+        app.logger.info(f"Database initialized successfully with users table: {app.config['DATABASE_PATH']}")
+        return True
     except Exception as e:
         app.logger.error(f"Database check failed: {e}")
         return False
@@ -59,21 +46,29 @@ def create_app(config_name='default'):
     """Create and configure the Flask application."""
     app = Flask(__name__)
 
-    # Load configuration
-    app.config.from_object(config[config_name])
+    # Load configuration (reads .env once per process)
+    app.config.from_object(config[config_name].from_env())
+
+    # Use orjson for jsonify() when it is installed
+    if HAS_ORJSON:
+        app.json = OrjsonProvider(app)
 
     # Log database path for debugging
     app.logger.info(f"Using database path: {app.config['DATABASE_PATH']}")
     app.logger.info(f"Database file exists: {os.path.exists(app.config['DATABASE_PATH'])}")
 
-    # Initialize database
-    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{app.config['DATABASE_PATH']}"
-    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
     # Initialize extensions
     db.init_app(app)
     init_db_app(app)
 
+    # ORM connections get the same PRAGMAs as the raw sqlite3 pool
+    with app.app_context():
+        event.listen(db.engine, 'connect', apply_pragmas)
+    app.extensions['bcrypt_rounds'] = app.config['PASSWORD_HASH_ROUNDS']
+
+    # Cap concurrent bcrypt/argon2 work at the core count; request threads still wait for their hash
+    app.extensions['hash_pool'] = hash_pool()
+
     # Check if database is initialized
     if not check_database_initialized(app):
         app.logger.warning(
@@ -81,8 +76,7 @@ def create_app(config_name='default'):
             "Some features may not work correctly."
         )
 
-    # Register blueprints
-    from app.routes import api
-    app.register_blueprint(api)
+    # Register routes (view modules are imported on first request)
+    register_urls(app)
 
     return app
@@ -5,12 +5,28 @@ This module contains configuration classes for different environments.
 """
 
 import os
+import functools
+from dataclasses import dataclass
 from datetime import timedelta
+from typing import Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=1)
+def load_env():
+    """Load the .env file once per process, if python-dotenv is installed."""
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        # python-dotenv not installed, continue without it
+        return False
+
+    load_dotenv()
+    return True
+
+
 def get_absolute_db_path(db_path):
     """Convert database path to absolute path if it's not already absolute."""
     if not os.path.isabs(db_path):
@@ -18,16 +34,46 @@ def get_absolute_db_path(db_path):
     return db_path
 
 
+@dataclass(frozen=True)
+class EnvSnapshot:
+    """Environment values used by the configuration classes."""
+    database_path: str
+    jwt_secret_key: Optional[str]
+
+
+@functools.lru_cache(maxsize=1)
+def env_snapshot():
+    """Read the environment once (after loading .env) and cache the result."""
+    load_env()
+    return EnvSnapshot(
+        database_path=get_absolute_db_path(os.environ.get('DATABASE_PATH', 'auth.db')),
+        jwt_secret_key=os.environ.get('JWT_SECRET_KEY')
+    )
+
+
 class Config:
     """Base configuration class."""
     # SQLite database path - always use absolute path
-    db_path = os.environ.get('DATABASE_PATH', 'auth.db')
-    DATABASE_PATH = get_absolute_db_path(db_path)
+    DATABASE_PATH = get_absolute_db_path('auth.db')
+
+    # SQLAlchemy settings (URI is derived from DATABASE_PATH once per class)
+    SQLALCHEMY_DATABASE_URI = f"sqlite:///{DATABASE_PATH}"
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # SQLAlchemy 2.x already uses a QueuePool for file databases, which keeps
+    # connections open; StaticPool would share one connection across threads
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'connect_args': {'check_same_thread': False},
+        'pool_pre_ping': True,
+        'pool_recycle': 3600
+    }
 
     # JWT configuration
-    JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'your-secret-key-change-in-production')
+    JWT_SECRET_KEY = 'your-secret-key-change-in-production'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
 
+    # Number of pooled raw sqlite3 connections (see app.database)
+    SQLITE_POOL_SIZE = 8
+
     # Password hashing difficulty
     PASSWORD_HASH_ROUNDS = 12  # For bcrypt
 
@@ -38,6 +84,22 @@ class Config:
     DEBUG = False
     TESTING = False
 
+    @classmethod
+    def env_overrides(cls):
+        """Return the settings that are read from the environment."""
+        env = env_snapshot()
+        return {
+            'DATABASE_PATH': env.database_path,
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{env.database_path}",
+            'JWT_SECRET_KEY': env.jwt_secret_key or cls.JWT_SECRET_KEY,
+        }
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def from_env(cls):
+        """Build a configuration class with environment values applied."""
+        return type(cls.__name__, (cls,), cls.env_overrides())
+
 
 class DevelopmentConfig(Config):
     """Development configuration."""
@@ -48,18 +110,31 @@ class TestingConfig(Config):
     """Testing configuration."""
     TESTING = True
     DATABASE_PATH = get_absolute_db_path('test_auth.db')
+    SQLALCHEMY_DATABASE_URI = f"sqlite:///{DATABASE_PATH}"
+
+    @classmethod
+    def env_overrides(cls):
+        """Return the settings that are read from the environment."""
+        overrides = super().env_overrides()
+        # Tests always use their own database file
+        overrides.pop('DATABASE_PATH')
+        overrides.pop('SQLALCHEMY_DATABASE_URI')
+        return overrides
 
 
 class ProductionConfig(Config):
     """Production configuration."""
-    JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY')
-    if not JWT_SECRET_KEY:
-        # Log a warning instead of raising an error
-        logger.warning("JWT_SECRET_KEY not set in environment, using default (NOT SECURE FOR PRODUCTION)")
-        JWT_SECRET_KEY = Config.JWT_SECRET_KEY
-
     PASSWORD_HASH_ROUNDS = 14  # Higher for production
 
+    @classmethod
+    def env_overrides(cls):
+        """Return the settings that are read from the environment."""
+        overrides = super().env_overrides()
+        if not env_snapshot().jwt_secret_key:
+            # Log a warning instead of raising an error
+            logger.warning("JWT_SECRET_KEY not set in environment, using default (NOT SECURE FOR PRODUCTION)")
+        return overrides
+
 
 # Configuration dictionary
 config = {
@@ -4,32 +4,108 @@ Flask Auth Service API - Database Connection Utilities.
 This module provides database connection and session management functions.
 """
 
+import queue
 import sqlite3
+import threading
 from flask import g, current_app
 
+# Applied once when a pooled connection is opened, not on every checkout
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL;"
+    "PRAGMA synchronous=NORMAL;"
+    "PRAGMA temp_store=MEMORY;"
+    "PRAGMA mmap_size=268435456;"
+    "PRAGMA foreign_keys=ON;"
+)
+
+
+def apply_pragmas(dbapi_conn, connection_record=None):
+    """Apply CONNECTION_PRAGMAS to a newly opened connection (usable as an SQLAlchemy connect hook)."""
+    dbapi_conn.executescript(CONNECTION_PRAGMAS)
+
+
+class SQLitePool:
+    """Bounded pool of reusable SQLite connections."""
+
+    def __init__(self, path, size=8):
+        self.path = path
+        self.size = size
+        self._q = queue.LifoQueue(maxsize=size)
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        """Open a new connection for the pool."""
+        # No detect_types: no converters are registered, so decltype parsing is wasted work
+        conn = sqlite3.connect(
+            self.path,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        conn.row_factory = sqlite3.Row
+        apply_pragmas(conn)
+        return conn
+
+    def acquire(self):
+        """Take a connection from the pool, opening one if the pool is not full yet."""
+        try:
+            return self._q.get_nowait()
+        except queue.Empty:
+            pass
+
+        # Connections are opened lazily so the database file is not created early
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                try:
+                    return self._connect()
+                except Exception:
+                    self._created -= 1
+                    raise
+
+        # Pool is exhausted, wait for a connection to be released
+        return self._q.get()
+
+    def release(self, conn):
+        """Return a connection to the pool."""
+        if conn.in_transaction:
+            conn.rollback()
+        self._q.put(conn)
+
+    def close(self):
+        """Close all idle connections in the pool."""
+        while True:
+            try:
+                conn = self._q.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+
 
 def get_db():
     """Get database connection."""
     if 'db' not in g:
-        g.db = sqlite3.connect(
-            current_app.config['DATABASE_PATH'],
-            detect_types=sqlite3.PARSE_DECLTYPES
-        )
-        g.db.row_factory = sqlite3.Row
+        g.db = current_app.extensions['sqlite_pool'].acquire()
 
     return g.db
 
 
 def close_db(e=None):
-    """Close database connection."""
+    """Return database connection to the pool."""
     db = g.pop('db', None)
 
     if db is not None:
-        db.close()
+        current_app.extensions['sqlite_pool'].release(db)
 
 
 def init_app(app):
     """Initialize app with database functions."""
+    app.extensions['sqlite_pool'] = SQLitePool(
+        app.config['DATABASE_PATH'],
+        size=app.config.get('SQLITE_POOL_SIZE', 8)
+    )
     app.teardown_appcontext(close_db)
 
 
@@ -56,4 +132,4 @@ def execute_sql_file(file_path):
 
     db = get_db()
     db.executescript(sql)
-    db.commit()
\ No newline at end of file
+    db.commit()
@@ -5,22 +5,36 @@ This module provides utility functions for working with database paths consisten
 """
 
 import os
+import re
+import sqlite3
+import functools
 import logging
+from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Matches the DATABASE_PATH entry of a .env file in one pass
+_DATABASE_PATH_RE = re.compile(r'^DATABASE_PATH[ \t]*=[ \t]*[\'"]?([^\'"\r\n]*)', re.M)
+
+# Databases already known to contain the users table
+_VERIFIED_PATHS = set()
+
+@functools.lru_cache(maxsize=8)
 def get_db_path(env_file='.env'):
-    """Get the absolute database path from the environment or .env file."""
+    """Get the absolute database path from the environment or .env file.
+
+    The result is cached per env_file, so DATABASE_PATH is read from the
+    environment only on the first call; later changes to os.environ are not seen.
+    """
     # First check if DATABASE_PATH is in environment
     db_path = os.environ.get('DATABASE_PATH')
 
     # If not, try to read from .env file
     if not db_path and os.path.exists(env_file):
-        with open(env_file, 'r') as f:
-            for line in f:
-                if line.startswith('DATABASE_PATH='):
-                    db_path = line.strip().split('=', 1)[1].strip("'\"")
-                    break
+        match = _DATABASE_PATH_RE.search(Path(env_file).read_text())
+        # An empty value (DATABASE_PATH=) counts as not set
+        if match:
+            db_path = match.group(1).strip() or None
 
     # Default to auth.db in the project root if not found
     if not db_path:
@@ -32,4 +46,26 @@ def get_db_path(env_file='.env'):
         db_path = os.path.abspath(db_path)
         logger.info(f"Using absolute database path: {db_path}")
 
-    return db_path
\ No newline at end of file
+    return db_path
+
+
+def verify_users_table(path):
+    """Check that the database at path exists and contains the users table."""
+    # Only successful checks are cached so a database initialized later is picked up
+    if path in _VERIFIED_PATHS:
+        return True
+
+    if not os.path.exists(path):
+        return False
+
+    conn = sqlite3.connect(path)
+    try:
+        found = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='users' LIMIT 1"
+        ).fetchone() is not None
+    finally:
+        conn.close()
+
+    if found:
+        _VERIFIED_PATHS.add(path)
+    return found
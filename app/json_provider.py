@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Flask Auth Service API - JSON Provider.
+This module provides an orjson-backed JSON provider used when orjson is installed.
+"""
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that serializes with orjson instead of the stdlib json module."""
+
+    def dumps(self, obj, **kwargs):
+        """Serialize data as JSON using orjson."""
+        # Pass datetimes through to the default handler so output matches Flask's
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=kwargs.get('default', self.default), option=option).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        """Deserialize data as JSON using orjson."""
+        return orjson.loads(s)
@@ -35,9 +35,13 @@ class User(db.Model):
     @classmethod
     def find_by_identifier(cls, identifier):
         """Find user by username or email."""
-        return cls.query.filter(
-            (cls.username == identifier) | (cls.email == identifier)
-        ).first()
+        # Emails always contain '@', so a plain identifier can only be a username
+        if '@' not in identifier:
+            return cls.find_by_username(identifier)
+
+        # Usernames are validated not to contain '@', but rows created outside
+        # the API may not be, so fall back to a username lookup
+        return cls.find_by_email(identifier) or cls.find_by_username(identifier)
 
     def save(self):
         """Save user to database."""
@@ -49,6 +53,14 @@ class User(db.Model):
         db.session.delete(self)
         db.session.commit()
 
+    def _created_at_iso(self):
+        """Return created_at as an ISO string, cached until created_at changes."""
+        cached = getattr(self, '_created_at_iso_cache', None)
+        if cached is None or cached[0] is not self.created_at:
+            iso = self.created_at.isoformat() if self.created_at else None
+            cached = self._created_at_iso_cache = (self.created_at, iso)
+        return cached[1]
+
     def to_dict(self):
         """Convert user to dictionary."""
         return {
@@ -56,6 +68,6 @@ class User(db.Model):
             'role': self.role,
             'email': self.email,
             'creation_method': self.creation_method,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'created_at': self._created_at_iso(),
             'is_active': self.is_active
         }
\ No newline at end of file
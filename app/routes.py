@@ -4,26 +4,45 @@ Flask Auth Service API - API Routes.
 This module defines API endpoints for user authentication and management.
 """
 
-from flask import Blueprint, request, jsonify, current_app, g
+from flask import Response, request, jsonify, current_app, g
 from marshmallow import ValidationError
 from app.models import User
 from app.schemas import RegisterSchema, LoginSchema, UserSchema
-from app.utils import hash_password, verify_password, generate_jwt, validate_jwt
+from app.utils import hash_password, verify_password, generate_jwt, validate_jwt, run_in_hash_pool
 import functools
+import json
 import logging
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
-# Create blueprint
-api = Blueprint('api', __name__, url_prefix='/api/user')
-
 # Schemas
 register_schema = RegisterSchema()
 login_schema = LoginSchema()
 user_schema = UserSchema()
 
 
+# Pre-serialized bodies for fixed error messages, keyed by message
+_ERROR_BODIES = {}
+
+
+def error_response(message, status):
+    """Build a JSON error response, serializing each distinct message only once."""
+    body = _ERROR_BODIES.get(message)
+    if body is None:
+        body = _ERROR_BODIES[message] = json.dumps({'error': message}, separators=(',', ':')) + '\n'
+    # A new Response per call, since responses are mutable (headers, cookies)
+    return Response(body, status=status, mimetype='application/json')
+
+
+def load_user(username):
+    """Find user by username, memoized for the duration of the current request."""
+    cache = g.setdefault('_user_cache', {})
+    if username not in cache:
+        cache[username] = User.find_by_username(username)
+    return cache[username]
+
+
 # Decorator for routes that require authentication
 def jwt_required(f):
     @functools.wraps(f)
@@ -31,24 +50,24 @@ def jwt_required(f):
         # Get token from header
         auth_header = request.headers.get('Authorization')
         if not auth_header or not auth_header.startswith('Bearer '):
-            return jsonify({'error': 'Missing or invalid authorization header.'}), 401
+            return error_response('Missing or invalid authorization header.', 401)
 
         token = auth_header.split(' ')[1]
 
         # Validate token
         payload = validate_jwt(token)
         if not payload:
-            return jsonify({'error': 'Invalid or expired token.'}), 401
+            return error_response('Invalid or expired token.', 401)
 
         # Get user from database
         username = payload.get('sub')
-        user = User.find_by_username(username)
+        user = load_user(username)
 
         if not user:
-            return jsonify({'error': 'User not found.'}), 404
+            return error_response('User not found.', 404)
 
         if not user.is_active:
-            return jsonify({'error': 'User is disabled.'}), 401
+            return error_response('User is disabled.', 401)
 
         # Store user in g
         g.user = user
@@ -58,8 +77,7 @@ def jwt_required(f):
     return decorated
 
 
-# Routes
-@api.route('/register', methods=['POST'])
+# Routes (URL rules are registered in app.views)
 def register():
     """Register a new user."""
     # Validate request data
@@ -75,17 +93,17 @@ def register():
     # Check if username or email already exists
     user = User.find_by_username(username)
     if user:
-        return jsonify({'error': 'Username already exists.'}), 409
+        return error_response('Username already exists.', 409)
 
     if email:
         user = User.find_by_email(email)
         if user:
-            return jsonify({'error': 'Email already exists.'}), 409
+            return error_response('Email already exists.', 409)
 
     # Create new user
     user = User(
         username=username,
-        password_hash=hash_password(password),
+        password_hash=run_in_hash_pool(hash_password, password),
         role='normal',
         creation_method='web',
         email=email
@@ -96,7 +114,7 @@ def register():
         user.save()
     except Exception as e:
         logger.error(f"Error creating user: {e}")
-        return jsonify({'error': 'Error creating user.'}), 500
+        return error_response('Error creating user.', 500)
 
     # Return created user
     return jsonify({
@@ -105,7 +123,6 @@ def register():
     }), 201
 
 
-@api.route('/login', methods=['POST'])
 def login():
     """Login user."""
     # Validate request data
@@ -120,9 +137,13 @@ def login():
     # Find user by identifier (username or email)
     user = User.find_by_identifier(identifier)
 
-    # Check user and password
-    if not user or not user.is_active or not verify_password(password, user.password_hash):
-        return jsonify({'error': 'Invalid credentials.'}), 401
+    # Reject missing or disabled users before paying for a password hash
+    if user is None or not user.is_active:
+        return error_response('Invalid credentials.', 401)
+
+    # Check password
+    if not run_in_hash_pool(verify_password, password, user.password_hash):
+        return error_response('Invalid credentials.', 401)
 
     # Generate JWT
     token = generate_jwt(user.username, user.role)
@@ -135,7 +156,6 @@ def login():
     }), 200
 
 
-@api.route('/me', methods=['GET'])
 @jwt_required
 def get_me():
     """Get current user information."""
@@ -6,9 +6,11 @@ This script is the entry point for running the application.
 
 import os
 import sys
+import sqlite3
 import logging
 from pathlib import Path
 from app import create_app
+from app.db_path_helper import verify_users_table
 
 # Set up logging
 logging.basicConfig(
@@ -24,7 +26,7 @@ def check_database_file():
         # Get the database path from the config module
         # This ensures we use the same path resolution as the app
         from app.config import Config
-        db_path = Config.DATABASE_PATH
+        db_path = Config.from_env().DATABASE_PATH
 
         logger.info(f"Checking database file at path: {db_path}")
 
@@ -33,18 +35,12 @@ def check_database_file():
             logger.info("Please run 'python scripts/init_db.py' to initialize the database.")
             return False
 
-        # Try to connect to the database to check if it's valid
-        import sqlite3
+        # Check that the database is valid and has the users table
         try:
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='users'")
-            if cursor.fetchone() is None:
+            if not verify_users_table(db_path):
                 logger.error(f"Users table not found in database: {db_path}")
                 logger.info("Please run 'python scripts/init_db.py' to initialize the database.")
-                conn.close()
                 return False
-            conn.close()
         except sqlite3.Error as e:
             logger.error(f"Failed to connect to database: {e}")
             return False
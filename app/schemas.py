@@ -4,15 +4,19 @@ Flask Auth Service API - Data Validation Schemas.
 This module defines Marshmallow schemas for request/response validation and serialization.
 """
 
+import re
 from marshmallow import Schema, fields, validate, ValidationError
 
+# Compiled once at import; \Z (not $) so a trailing newline is rejected
+_USERNAME_RE = re.compile(r'^[a-zA-Z0-9_-]{3,30}\Z')
+
 
 class RegisterSchema(Schema):
     """Schema for user registration."""
     username = fields.Str(
         required=True,
         validate=validate.Regexp(
-            r'^[a-zA-Z0-9_-]{3,30}$',
+            _USERNAME_RE,
             error="Username must be 3-30 characters, alphanumeric with underscores and hyphens."
         )
     )
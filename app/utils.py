@@ -4,56 +4,119 @@ Flask Auth Service API - Utility Functions.
 This module provides helper functions for password hashing, JWT generation/validation, etc.
 """
 
-import jwt
+import importlib.util
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from flask import current_app
-import bcrypt
 
-try:
-    from argon2 import PasswordHasher
+# Hashing and JWT libraries are imported on first use to keep app start-up fast
+HAS_ARGON2 = importlib.util.find_spec('argon2') is not None
 
-    HAS_ARGON2 = True
-except ImportError:
-    HAS_ARGON2 = False
+_PH = None
+_PH_LOCK = threading.Lock()
+_HASH_POOL = None
+_HASH_POOL_LOCK = threading.Lock()
+_jwt_mod = None
+
+
+def _password_hasher():
+    """Return the shared argon2 PasswordHasher, creating it on first use."""
+    global _PH
+    if _PH is None:
+        with _PH_LOCK:
+            if _PH is None:
+                from argon2 import PasswordHasher
+                _PH = PasswordHasher()
+    return _PH
+
+
+def hash_pool():
+    """Return the process-wide password hashing pool, creating it on first use."""
+    global _HASH_POOL
+    if _HASH_POOL is None:
+        with _HASH_POOL_LOCK:
+            if _HASH_POOL is None:
+                # One pool shared by every app, so repeated create_app() calls don't leak threads
+                _HASH_POOL = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix='hash')
+    return _HASH_POOL
+
+
+def _jwt():
+    """Return the PyJWT module, importing it on first use."""
+    global _jwt_mod
+    if _jwt_mod is None:
+        import jwt as _jwt_mod
+    return _jwt_mod
+
+
+def _get_rounds():
+    """Return the bcrypt cost factor cached on the app at creation time."""
+    rounds = current_app.extensions.get('bcrypt_rounds')
+    if rounds is None:
+        rounds = current_app.config.get('PASSWORD_HASH_ROUNDS', 12)
+    return rounds
 
 
 # Password hashing functions
 def hash_password(password):
     """Hash password using preferred algorithm."""
     if HAS_ARGON2:
-        ph = PasswordHasher()
-        return ph.hash(password)
+        return _password_hasher().hash(password)
     else:
         # Use bcrypt
-        rounds = current_app.config.get('PASSWORD_HASH_ROUNDS', 12)
-        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=rounds)).decode('utf-8')
+        import bcrypt
+        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=_get_rounds())).decode('utf-8')
 
 
 def verify_password(password, password_hash):
     """Verify password against hash."""
     if HAS_ARGON2 and password_hash.startswith('$argon2'):
         try:
-            ph = PasswordHasher()
-            ph.verify(password_hash, password)
+            _password_hasher().verify(password_hash, password)
             return True
         except Exception:
             return False
     else:
         # Assume bcrypt
+        import bcrypt
         return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
 
 
+def run_in_hash_pool(func, *args):
+    """Run a password hashing function on the app's hash pool and wait for the result.
+
+    The calling request thread blocks until the hash finishes; the pool only
+    caps how many hashes run at once.
+    """
+    pool = current_app.extensions.get('hash_pool')
+    if pool is None:
+        return func(*args)
+
+    # Hashing functions may read app config, so push the app context in the worker
+    app = current_app._get_current_object()
+
+    def call():
+        with app.app_context():
+            return func(*args)
+
+    return pool.submit(call).result()
+
+
 # JWT functions
 def generate_jwt(username, role):
     """Generate JWT token."""
+    now = datetime.utcnow()
+    expires = current_app.config.get('JWT_ACCESS_TOKEN_EXPIRES') or timedelta(hours=1)
     payload = {
         'sub': username,
         'role': role,
-        'iat': datetime.utcnow(),
-        'exp': datetime.utcnow() + current_app.config.get('JWT_ACCESS_TOKEN_EXPIRES', timedelta(hours=1))
+        'iat': now,
+        'exp': now + expires
     }
 
-    token = jwt.encode(
+    token = _jwt().encode(
         payload,
         current_app.config['JWT_SECRET_KEY'],
         algorithm='HS256'
@@ -68,6 +131,7 @@ def generate_jwt(username, role):
 
 def validate_jwt(token):
     """Validate JWT token."""
+    jwt = _jwt()
     try:
         return jwt.decode(
             token,
@@ -75,4 +139,4 @@ def validate_jwt(token):
             algorithms=['HS256']
         )
     except jwt.PyJWTError:
-        return None
\ No newline at end of file
+        return None
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Flask Auth Service API - Lazy View Loading.
+This module defines the URL map and loads view functions on first request.
+"""
+
+from werkzeug.utils import import_string, cached_property
+
+
+class LazyView:
+    """View function proxy that imports the real view on first call."""
+
+    def __init__(self, import_name):
+        self.__module__, self.__name__ = import_name.rsplit('.', 1)
+        self.import_name = import_name
+
+    @cached_property
+    def view(self):
+        return import_string(self.import_name)
+
+    def __call__(self, *args, **kwargs):
+        return self.view(*args, **kwargs)
+
+
+# URL map: (rule relative to API_PREFIX, view import name, methods)
+URL_MAP = (
+    ('/register', 'app.routes.register', ['POST']),
+    ('/login', 'app.routes.login', ['POST']),
+    ('/me', 'app.routes.get_me', ['GET']),
+)
+
+
+def register_urls(app):
+    """Register all API routes on the app without importing the view modules."""
+    prefix = app.config['API_PREFIX']
+    for rule, import_name, methods in URL_MAP:
+        app.add_url_rule(prefix + rule, view_func=LazyView(import_name), methods=methods)
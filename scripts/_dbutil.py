@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Shared database helpers for the CLI scripts.
+This module opens SQLite connections with the same PRAGMA tuning in every script.
+"""
+
+import sqlite3
+
+# WAL lets readers run alongside a writer, NORMAL sync cuts fsyncs per commit
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL;"
+    "PRAGMA synchronous=NORMAL;"
+    "PRAGMA busy_timeout=5000;"
+    "PRAGMA cache_size=-20000;"
+    "PRAGMA temp_store=MEMORY;"
+)
+
+
+def open_conn(path):
+    """Open a tuned SQLite connection to the database at path."""
+    # Default isolation level is kept so 'with conn:' still wraps a transaction;
+    # a larger statement cache keeps the compiled INSERT/UPDATE shapes around
+    conn = sqlite3.connect(path, cached_statements=256)
+    conn.executescript(CONNECTION_PRAGMAS)
+    return conn
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Shared environment file helpers for the CLI scripts.
+This module parses .env files once per process and caches the result.
+"""
+
+import re
+import functools
+from pathlib import Path
+
+# One KEY=VALUE entry per line; comment and blank lines never match
+_ENV_LINE_RE = re.compile(rb'^[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*(.*?)[ \t]*\r?$', re.M)
+
+
+@functools.lru_cache(maxsize=8)
+def load_env(path='.env'):
+    """Parse the KEY=VALUE lines of an env file into a dict (cached per path)."""
+    # Read the whole file at once (no separate existence check) and pick out entries in a single regex scan
+    try:
+        data = Path(path).read_bytes()
+    except FileNotFoundError:
+        return {}
+    # Only the matched keys and values are decoded; comment and blank lines stay as bytes
+    return {
+        key.decode('ascii'): value.strip(b"'\"").decode('utf-8')
+        for key, value in _ENV_LINE_RE.findall(data)
+    }
@@ -12,8 +12,15 @@ import argparse
 import logging
 import re
 import string
-import random
+import secrets
+import csv
+import json
+import multiprocessing
 from pathlib import Path
+from contextlib import closing
+
+from _dbutil import open_conn
+from _envutil import load_env
 from datetime import datetime
 
 # Import password hashing library
@@ -21,6 +28,9 @@ try:
     from argon2 import PasswordHasher
 
     HASH_METHOD = "argon2"
+    # Built once per process (batch worker processes build their own on import).
+    # Parameters are argon2-cffi's RFC 9106 low-memory defaults, spelled out for tuning.
+    _PH = PasswordHasher(time_cost=3, memory_cost=65536, parallelism=4)
 except ImportError:
     try:
         import bcrypt
@@ -38,6 +48,23 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Validation pattern, compiled once at import
+_USERNAME_RE = re.compile(r'^[a-zA-Z0-9_-]{3,30}$')
+
+# Character set for generated passwords
+_PW_CHARS = string.ascii_letters + string.digits + string.punctuation
+
+# SQL statements (bound parameters so SQLite can reuse the compiled statement)
+INSERT_USER_SQL = (
+    "INSERT INTO users (username, password_hash, role, creation_method, email, is_active, created_at) "
+    "VALUES (?, ?, ?, ?, ?, 1, CURRENT_TIMESTAMP) "
+    "ON CONFLICT(username) DO NOTHING"
+)
+UPDATE_USER_SQL = "UPDATE users SET {assignments} WHERE username = ?"
+
+# Text fields read from each create-batch record
+BATCH_FIELDS = ('username', 'password', 'role', 'email')
+
 
 def get_db_path(env_file='.env'):
     """Get the database path from the environment or .env file."""
@@ -45,12 +72,8 @@ def get_db_path(env_file='.env'):
     db_path = os.environ.get('DATABASE_PATH')
 
     # If not, try to read from .env file
-    if not db_path and os.path.exists(env_file):
-        with open(env_file, 'r') as f:
-            for line in f:
-                if line.startswith('DATABASE_PATH='):
-                    db_path = line.strip().split('=', 1)[1].strip("'\"")
-                    break
+    if not db_path:
+        db_path = load_env(env_file).get('DATABASE_PATH')
 
     # Default to auth.db in the project root if not found
     if not db_path:
@@ -60,32 +83,38 @@ def get_db_path(env_file='.env'):
     return db_path
 
 
-def get_sql_template(template_file):
-    """Read a SQL template file."""
-    try:
-        with open(template_file, 'r') as f:
-            return f.read()
-    except FileNotFoundError:
-        logger.error(f"Template file not found: {template_file}")
-        return None
-
-
 def hash_password(password):
     """Hash a password using the available method."""
     if HASH_METHOD == "argon2":
-        ph = PasswordHasher()
-        return ph.hash(password)
+        return _PH.hash(password)
     else:  # bcrypt
         return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
 
 
+def hash_passwords(passwords):
+    """Hash many passwords, using one process per CPU core for larger batches."""
+    if len(passwords) < 2:
+        return [hash_password(p) for p in passwords]
+
+    # Password hashing is CPU-bound, so spread it across processes
+    with multiprocessing.Pool(processes=min(os.cpu_count() or 1, len(passwords))) as pool:
+        return pool.map(hash_password, passwords)
+
+
 def validate_email(email):
     """Validate email format."""
     if not email:
         return True  # Empty email is allowed
 
-    email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(email_pattern, email))
+    # Minimal structural check (local@domain.tld); real validation needs a confirmation email
+    local, _, domain = email.partition('@')
+    return (
+        bool(local)
+        and '@' not in domain
+        and '.' in domain.strip('.')
+        and not any(c.isspace() for c in email)
+        and len(email) <= 254
+    )
 
 
 def validate_username(username):
@@ -94,14 +123,12 @@ def validate_username(username):
         return False
 
     # Username must be 3-30 characters, alphanumeric with underscores and hyphens
-    username_pattern = r'^[a-zA-Z0-9_-]{3,30}$'
-    return bool(re.match(username_pattern, username))
+    return bool(_USERNAME_RE.match(username))
 
 
 def generate_password(length=12):
     """Generate a random password."""
-    chars = string.ascii_letters + string.digits + string.punctuation
-    return ''.join(random.choice(chars) for _ in range(length))
+    return ''.join(secrets.choice(_PW_CHARS) for _ in range(length))
 
 
 def user_exists(conn, username):
@@ -115,25 +142,13 @@ def create_user(conn, username, password_hash, role, email=None):
     """Create a new user in the database."""
     cursor = conn.cursor()
 
-    # Prepare the email value for SQL
-    email_value = f"'{email}'" if email else "NULL"
-
-    # Use the template to create the SQL
-    template = get_sql_template('sql/insert_user.sql.template')
-    if not template:
-        logger.error("Failed to read insert user SQL template")
-        return False
-
-    # Replace template variables
-    sql = template.replace('${username}', username)
-    sql = sql.replace('${password_hash}', password_hash)
-    sql = sql.replace('${role}', role)
-    sql = sql.replace('${creation_method}', 'local')
-    sql = sql.replace('${email}', email_value)
-
     try:
-        cursor.executescript(sql)
-        conn.commit()
+        # Existing usernames are detected by the insert itself (no separate lookup)
+        cursor.execute(INSERT_USER_SQL, (username, password_hash, role, 'local', email))
+        if cursor.rowcount == 0:
+            logger.error(f"User '{username}' already exists. Use the 'update' command to modify existing users.")
+            return False
+
         logger.info(f"User '{username}' created successfully with role '{role}'")
         return True
     except sqlite3.Error as e:
@@ -145,31 +160,38 @@ def update_user(conn, username, password=None, role=None, email=None, is_active=
     """Update an existing user in the database."""
     cursor = conn.cursor()
 
-    # Prepare the set clauses
-    password_set = f"password_hash = '{hash_password(password)}'," if password else ""
-    email_set = f"email = '{email}'," if email else ""
-    is_active_value = 1 if is_active else 0 if is_active is not None else 1
-
-    # Use the template to create the SQL
-    template = get_sql_template('sql/update_user.sql.template')
-    if not template:
-        logger.error("Failed to read update user SQL template")
-        return False
+    # Only update the columns that were provided, always with bound parameters
+    assignments = []
+    params = []
+    if role:
+        assignments.append("role = ?")
+        params.append(role)
+    if password:
+        assignments.append("password_hash = ?")
+        params.append(hash_password(password))
+    if email:
+        assignments.append("email = ?")
+        params.append(email)
+    if is_active is not None:
+        assignments.append("is_active = ?")
+        params.append(1 if is_active else 0)
+
+    if not assignments:
+        if not user_exists(conn, username):
+            logger.error(f"User '{username}' does not exist. Use the 'create' command to create a new user.")
+            return False
+        logger.info(f"No changes requested for user '{username}'")
+        return True
 
-    # Replace template variables
-    sql = template.replace('${username}', username)
-    sql = sql.replace('${role}', role or 'normal')
-    sql = sql.replace('${password_set}', password_set)
-    sql = sql.replace('${email_set}', email_set)
-    sql = sql.replace('${is_active}', str(is_active_value))
+    sql = UPDATE_USER_SQL.format(assignments=", ".join(assignments))
+    params.append(username)
 
     try:
-        cursor.executescript(sql)
+        cursor.execute(sql, params)
         if cursor.rowcount == 0:
-            logger.warning(f"No user found with username '{username}'")
+            logger.error(f"User '{username}' does not exist. Use the 'create' command to create a new user.")
             return False
 
-        conn.commit()
         logger.info(f"User '{username}' updated successfully")
         return True
     except sqlite3.Error as e:
@@ -177,6 +199,80 @@ def update_user(conn, username, password=None, role=None, email=None, is_active=
         return False
 
 
+def load_batch_file(file_path):
+    """Load user records from a CSV (with header) or JSON list file."""
+    path = Path(file_path)
+    if path.suffix.lower() == '.json':
+        with open(path, 'r') as f:
+            records = json.load(f)
+        if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+            raise ValueError("JSON batch file must contain a list of user objects")
+        # JSON allows numbers, lists etc. where text is expected; CSV fields are always strings
+        for i, record in enumerate(records, start=1):
+            for field in BATCH_FIELDS:
+                if not isinstance(record.get(field), (str, type(None))):
+                    raise ValueError(f"Record {i}: '{field}' must be a string")
+        return records
+
+    with open(path, 'r', newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def prepare_batch_users(records):
+    """Validate batch records and build INSERT parameter rows.
+
+    Returns (rows, generated), where generated lists (username, password) for
+    users given a random password, or None on error.
+    """
+    rows = []
+    generated = []
+    seen = set()
+    for i, record in enumerate(records, start=1):
+        username = (record.get('username') or '').strip()
+        role = (record.get('role') or 'normal').strip()
+        email = (record.get('email') or '').strip() or None
+        password = record.get('password') or None
+
+        if not validate_username(username):
+            logger.error(f"Record {i}: invalid username '{username}'.")
+            return None
+        if role not in ('normal', 'platinum'):
+            logger.error(f"Record {i}: invalid role '{role}'.")
+            return None
+        if email and not validate_email(email):
+            logger.error(f"Record {i}: invalid email format.")
+            return None
+        if username in seen:
+            logger.error(f"Record {i}: duplicate username '{username}' in file.")
+            return None
+        seen.add(username)
+
+        if not password:
+            password = generate_password()
+            generated.append((username, password))
+
+        rows.append((username, password, role, 'local', email))
+
+    # Hash all passwords before opening the write transaction
+    hashes = hash_passwords([row[1] for row in rows])
+    return [(u, h, r, m, e) for (u, _, r, m, e), h in zip(rows, hashes)], generated
+
+
+def create_users_batch(conn, rows):
+    """Insert many users; the caller's transaction makes it all-or-nothing."""
+    try:
+        before = conn.total_changes
+        conn.executemany(INSERT_USER_SQL, rows)
+        skipped = len(rows) - (conn.total_changes - before)
+        if skipped:
+            raise sqlite3.IntegrityError(f"{skipped} username(s) already exist")
+        logger.info(f"Created {len(rows)} users in one transaction")
+        return True
+    except sqlite3.Error as e:
+        logger.error(f"Database error while creating users (no users were created): {e}")
+        return False
+
+
 def main():
     """Main function to parse arguments and manage users."""
     parser = argparse.ArgumentParser(description='Create or update users in the auth database.')
@@ -213,6 +309,14 @@ def main():
         help='Email address for the new user (optional)'
     )
 
+    # Batch create command
+    batch_parser = subparsers.add_parser('create-batch', help='Create many users from a CSV or JSON file')
+    batch_parser.add_argument(
+        '--file',
+        required=True,
+        help='CSV file with a username,password,role,email header, or a JSON list of objects with those keys'
+    )
+
     # Update user command
     update_parser = subparsers.add_parser('update', help='Update an existing user')
     update_parser.add_argument('username', help='Username of the user to update')
@@ -252,74 +356,85 @@ def main():
 
     # Connect to database
     try:
-        conn = sqlite3.connect(db_path)
+        conn = open_conn(db_path)
     except sqlite3.Error as e:
         logger.error(f"Failed to connect to database: {e}")
         sys.exit(1)
 
-    # Process command
-    if args.command == 'create':
-        # Validate inputs
-        if not validate_username(args.username):
-            logger.error(
-                "Invalid username. Username must be 3-30 characters, alphanumeric with underscores and hyphens.")
-            sys.exit(1)
-
-        if args.email and not validate_email(args.email):
-            logger.error("Invalid email format.")
-            sys.exit(1)
-
-        # Check if user already exists
-        if user_exists(conn, args.username):
-            logger.error(f"User '{args.username}' already exists. Use the 'update' command to modify existing users.")
-            sys.exit(1)
-
-        # Generate password if not provided
-        password = args.password
-        if not password:
-            password = generate_password()
-            logger.info(f"Generated random password for user '{args.username}': {password}")
-
-        # Hash password
-        password_hash = hash_password(password)
-
-        # Create user
-        if create_user(conn, args.username, password_hash, args.role, args.email):
-            logger.info(f"User '{args.username}' created successfully")
-        else:
-            logger.error(f"Failed to create user '{args.username}'")
-            sys.exit(1)
-
-    elif args.command == 'update':
-        # Check if user exists
-        if not user_exists(conn, args.username):
-            logger.error(f"User '{args.username}' does not exist. Use the 'create' command to create a new user.")
-            sys.exit(1)
-
-        # Validate email if provided
-        if args.email and not validate_email(args.email):
-            logger.error("Invalid email format.")
-            sys.exit(1)
-
-        # Determine is_active value
-        is_active = None
-        if args.activate and args.deactivate:
-            logger.error("Cannot both activate and deactivate a user.")
-            sys.exit(1)
-        elif args.activate:
-            is_active = True
-        elif args.deactivate:
-            is_active = False
-
-        # Update user
-        if update_user(conn, args.username, args.password, args.role, args.email, is_active):
-            logger.info(f"User '{args.username}' updated successfully")
-        else:
-            logger.error(f"Failed to update user '{args.username}'")
-            sys.exit(1)
-
-    # Close database connection
-    conn.close()
+    # One transaction for the whole command: committed on success, rolled back
+    # on any error (including sys.exit), and the connection is always closed
+    with closing(conn), conn:
+        # Process command
+        if args.command == 'create':
+            # Validate inputs
+            if not validate_username(args.username):
+                logger.error(
+                    "Invalid username. Username must be 3-30 characters, alphanumeric with underscores and hyphens.")
+                sys.exit(1)
+
+            if args.email and not validate_email(args.email):
+                logger.error("Invalid email format.")
+                sys.exit(1)
+
+            # Generate password if not provided
+            password = args.password or generate_password()
+
+            # Hash password
+            password_hash = hash_password(password)
+
+            # Create user (fails if the username already exists)
+            if create_user(conn, args.username, password_hash, args.role, args.email):
+                if not args.password:
+                    logger.info(f"Generated random password for user '{args.username}': {password}")
+                logger.info(f"User '{args.username}' created successfully")
+            else:
+                logger.error(f"Failed to create user '{args.username}'")
+                sys.exit(1)
+
+        elif args.command == 'create-batch':
+            # Load and validate all records
+            try:
+                records = load_batch_file(args.file)
+            except (OSError, ValueError) as e:
+                logger.error(f"Failed to read batch file: {e}")
+                sys.exit(1)
+
+            prepared = prepare_batch_users(records)
+            if prepared is None:
+                sys.exit(1)
+            rows, generated = prepared
+
+            # Create users
+            if not create_users_batch(conn, rows):
+                logger.error("Failed to create users from batch file")
+                sys.exit(1)
+
+            # Only report generated passwords once the users actually exist
+            for username, password in generated:
+                logger.info(f"Generated random password for user '{username}': {password}")
+
+        elif args.command == 'update':
+            # Validate email if provided
+            if args.email and not validate_email(args.email):
+                logger.error("Invalid email format.")
+                sys.exit(1)
+
+            # Determine is_active value
+            is_active = None
+            if args.activate and args.deactivate:
+                logger.error("Cannot both activate and deactivate a user.")
+                sys.exit(1)
+            elif args.activate:
+                is_active = True
+            elif args.deactivate:
+                is_active = False
+
+            # Update user
+            if update_user(conn, args.username, args.password, args.role, args.email, is_active):
+                logger.info(f"User '{args.username}' updated successfully")
+            else:
+                logger.error(f"Failed to update user '{args.username}'")
+                sys.exit(1)
 
 
 if __name__ == "__main__":
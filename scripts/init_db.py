@@ -11,6 +11,9 @@ import logging
 import sys
 from pathlib import Path
 
+from _dbutil import open_conn
+from _envutil import load_env
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -18,6 +21,10 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Schema version recorded in PRAGMA user_version after the SQL file runs;
+# bump this when the schema changes so existing databases are upgraded
+TARGET_SCHEMA_VERSION = 1
+
 
 def get_db_path(env_file='.env'):
     """Get the database path from the environment or .env file."""
@@ -31,7 +38,7 @@ def get_db_path(env_file='.env'):
             sys.path.append(parent_dir)
 
         from app.config import Config
-        db_path = Config.DATABASE_PATH
+        db_path = Config.from_env().DATABASE_PATH
         logger.info(f"Using database path from app config: {db_path}")
         return db_path
     except ImportError:
@@ -42,12 +49,8 @@ def get_db_path(env_file='.env'):
     db_path = os.environ.get('DATABASE_PATH')
 
     # If not, try to read from .env file
-    if not db_path and os.path.exists(env_file):
-        with open(env_file, 'r') as f:
-            for line in f:
-                if line.startswith('DATABASE_PATH='):
-                    db_path = line.strip().split('=', 1)[1].strip("'\"")
-                    break
+    if not db_path:
+        db_path = load_env(env_file).get('DATABASE_PATH')
 
     # Default to auth.db in the project root if not found
     if not db_path:
@@ -62,54 +65,47 @@ def get_db_path(env_file='.env'):
     return db_path
 
 
-def check_tables_exist(db_path):
-    """Check if the users table already exists in the database."""
-    if not os.path.exists(db_path):
-        return False
-
-    try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='users'")
-        result = cursor.fetchone()
-        conn.close()
-        return result is not None
-    except sqlite3.Error:
-        return False
-
-
 def init_db(db_path, sql_file, force=False):
     """Initialize the database by executing the SQL file."""
-    # Check if tables already exist
-    if check_tables_exist(db_path) and not force:
-        logger.info(f"Database already initialized with required tables: {db_path}")
-        return True
-
-    # Ensure the directory exists
-    db_dir = os.path.dirname(db_path)
-    if db_dir and not os.path.exists(db_dir):
-        os.makedirs(db_dir)
-        logger.info(f"Created directory: {db_dir}")
-
-    # Read SQL file
-    try:
-        with open(sql_file, 'r') as f:
-            sql_script = f.read()
-    except FileNotFoundError:
-        logger.error(f"SQL file not found: {sql_file}")
-        return False
-
-    # Connect to database and execute SQL
+    conn = None
     try:
-        conn = sqlite3.connect(db_path)
+        # For an existing database, check the schema version on the same
+        # connection that will run the SQL file if an upgrade is needed
+        if os.path.exists(db_path):
+            conn = open_conn(db_path)
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version == TARGET_SCHEMA_VERSION and not force:
+                logger.info(f"Database already initialized with schema version {TARGET_SCHEMA_VERSION}: {db_path}")
+                return True
+
+        # Ensure the directory exists
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+            logger.info(f"Created directory: {db_dir}")
+
+        # Read SQL file
+        try:
+            with open(sql_file, 'r') as f:
+                sql_script = f.read()
+        except FileNotFoundError:
+            logger.error(f"SQL file not found: {sql_file}")
+            return False
+
+        # Execute SQL and record the schema version
+        if conn is None:
+            conn = open_conn(db_path)
         conn.executescript(sql_script)
+        conn.execute(f"PRAGMA user_version = {TARGET_SCHEMA_VERSION}")
         conn.commit()
         logger.info(f"Database initialized successfully: {db_path}")
-        conn.close()
         return True
     except sqlite3.Error as e:
         logger.error(f"Database error: {e}")
         return False
+    finally:
+        if conn is not None:
+            conn.close()
 
 
 def main():
@@ -11,6 +11,9 @@ import argparse
 import logging
 from pathlib import Path
 
+from _dbutil import open_conn
+from _envutil import load_env
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -25,12 +28,8 @@ def get_db_path(env_file='.env'):
     db_path = os.environ.get('DATABASE_PATH')
 
     # If not, try to read from .env file
-    if not db_path and os.path.exists(env_file):
-        with open(env_file, 'r') as f:
-            for line in f:
-                if line.startswith('DATABASE_PATH='):
-                    db_path = line.strip().split('=', 1)[1].strip("'\"")
-                    break
+    if not db_path:
+        db_path = load_env(env_file).get('DATABASE_PATH')
 
     # Default to auth.db in the project root if not found
     if not db_path:
@@ -43,9 +42,15 @@ def get_db_path(env_file='.env'):
 def fetch_users(conn, limit=None, username=None, email=None, role=None):
     """Fetch users from the database based on filters."""
     cursor = conn.cursor()
-
-    # Start with base query
-    query = "SELECT username, role, creation_method, created_at, email, is_active FROM users"
+    cursor.row_factory = sqlite3.Row
+
+    # Start with base query (display formatting of email/is_active is done by SQLite)
+    query = (
+        "SELECT username, role, creation_method, created_at, "
+        "COALESCE(NULLIF(email, ''), 'N/A') AS email, "
+        "CASE WHEN is_active THEN 'Yes' ELSE 'No' END AS active "
+        "FROM users"
+    )
     params = []
 
     # Add filters
@@ -67,61 +72,59 @@ def fetch_users(conn, limit=None, username=None, email=None, role=None):
     # Add ordering
     query += " ORDER BY username"
 
-    # Add limit if specified
+    # Add limit if specified (bound, so the statement text stays the same)
     if limit:
-        query += f" LIMIT {limit}"
-
-    # Execute query
-    cursor.execute(query, params)
+        query += " LIMIT ?"
+        params.append(limit)
 
-    # Fetch results
-    return cursor.fetchall()
+    # Execute query and return the cursor so rows are streamed, not materialized
+    return cursor.execute(query, params)
 
 
 def display_users(users):
     """Display users in a nicely formatted table."""
-    if not users:
-        logger.info("No users found matching the specified criteria.")
-        return
-
     # Define headers
     headers = ["Username", "Role", "Creation Method", "Created At", "Email", "Active"]
-
-    # Calculate maximum width for each column
     widths = [len(h) for h in headers]
+
+    # Single pass over the rows: format each one and track column widths
+    rows = []
     for user in users:
-        for i in range(len(headers)):
-            value = str(user[i] if user[i] is not None else "N/A")
-            widths[i] = max(widths[i], min(len(value), 40))  # Limit column width to 40 chars
+        row_data = [
+            user['username'],
+            user['role'],
+            user['creation_method'],
+            user['created_at'],
+            user['email'],
+            user['active']
+        ]
+
+        # Stringify each value once, then truncate long values
+        cells = [str(val) for val in row_data]
+        lens = [len(cell) for cell in cells]
+        cells = [cell[:40] + '...' if n > 40 else cell for cell, n in zip(cells, lens)]
+
+        # Limit column width to 40 chars
+        widths = [max(w, min(n, 40)) for w, n in zip(widths, lens)]
 
-    # Define formatting string for each row
-    fmt = ' | '.join('{:<' + str(w) + '}' for w in widths)
+        rows.append(cells)
+
+    if not rows:
+        logger.info("No users found matching the specified criteria.")
+        return
 
     # Calculate total width
     total_width = sum(widths) + (len(widths) - 1) * 3
 
     # Print headers
-    print(fmt.format(*headers))
+    print(' | '.join(h.ljust(w) for h, w in zip(headers, widths)))
     print('-' * total_width)
 
     # Print each user
-    for user in users:
-        # Format row data
-        row_data = [
-            user[0],  # username
-            user[1],  # role
-            user[2],  # creation_method
-            user[3],  # created_at
-            user[4] if user[4] else "N/A",  # email (or N/A if None)
-            "Yes" if user[5] else "No"  # is_active
-        ]
-
-        # Truncate long values
-        row_data = [str(val)[:40] + ('...' if len(str(val)) > 40 else '') for val in row_data]
-
-        print(fmt.format(*row_data))
+    for row_data in rows:
+        print(' | '.join(cell.ljust(w) for cell, w in zip(row_data, widths)))
 
-    print(f"\nTotal users: {len(users)}")
+    print(f"\nTotal users: {len(rows)}")
 
 
 def main():
@@ -174,7 +177,7 @@ def main():
 
     # Connect to database
     try:
-        conn = sqlite3.connect(db_path)
+        conn = open_conn(db_path)
     except sqlite3.Error as e:
         logger.error(f"Failed to connect to database: {e}")
         sys.exit(1)
@@ -10,6 +10,9 @@ import argparse
 import logging
 import requests
 import json
+from requests.adapters import HTTPAdapter
+
+from _envutil import load_env
 
 # Set up logging
 logging.basicConfig(
@@ -18,21 +21,18 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Shared HTTP session so repeated requests reuse keep-alive connections
+_SESSION = requests.Session()
+_SESSION.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=16))
+_SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
 
 def get_api_config(env_file='.env'):
     """Get API host and port from environment or .env file."""
-    # Check environment variables first
-    host = os.environ.get('API_HOST', 'localhost')
-    port = os.environ.get('API_PORT', '5000')
-
-    # If not in environment, try to read from .env file
-    if (host == 'localhost' or port == '5000') and os.path.exists(env_file):
-        with open(env_file, 'r') as f:
-            for line in f:
-                if line.startswith('API_HOST='):
-                    host = line.strip().split('=', 1)[1].strip("'\"")
-                elif line.startswith('API_PORT='):
-                    port = line.strip().split('=', 1)[1].strip("'\"")
+    # Environment variables take precedence over the .env file, per key
+    env = load_env(env_file)
+    host = os.environ.get('API_HOST') or env.get('API_HOST') or 'localhost'
+    port = os.environ.get('API_PORT') or env.get('API_PORT') or '5000'
 
     return host, int(port)
 
@@ -46,8 +46,11 @@ def verify_login(host, port, identifier, password):
         "password": password
     }
 
+    # Serialize once, compactly, and send the bytes as-is
+    body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
     try:
-        response = requests.post(url, headers=headers, json=payload)
+        response = _SESSION.post(url, headers=headers, data=body)
         return response
     except requests.exceptions.RequestException as e:
         logger.error(f"Request failed: {e}")
@@ -62,7 +65,7 @@ def get_user_profile(host, port, access_token):
     }
 
     try:
-        response = requests.get(url, headers=headers)
+        response = _SESSION.get(url, headers=headers)
         return response
     except requests.exceptions.RequestException as e:
         logger.error(f"Profile request failed: {e}")
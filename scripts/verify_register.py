@@ -6,10 +6,14 @@ This script tests registration functionality by making HTTP requests to the Auth
 
 import os
 import sys
+import csv
 import argparse
 import logging
-import requests
-import json
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from _envutil import load_env
 
 # Set up logging
 logging.basicConfig(
@@ -18,29 +22,73 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Shared default HTTP session for callers that don't pass their own; main() creates one per run.
+# requests is imported on first use so --help and argument errors return without loading it.
+_SESSION = None
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+# Transient gateway errors of the kind a restarting Auth API returns; retried with backoff
+RETRY_STATUSES = (502, 503, 504)
+RETRY_TOTAL = 3
+
+
+def mount_adapters(session, pool_maxsize=20, retry=True):
+    """Mount keep-alive adapters sized to the number of concurrent requests."""
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    max_retries = 0
+    if retry:
+        max_retries = Retry(
+            total=RETRY_TOTAL,
+            # /register is not idempotent: a lost response after the server committed
+            # would come back as a 409, so only connect failures and 5xx are retried
+            read=0,
+            backoff_factor=0.2,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(["POST"]),
+            respect_retry_after_header=True,
+            # Hand the final 5xx response back to the caller instead of raising
+            raise_on_status=False,
+        )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=max_retries)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+
+def create_session(pool_maxsize=20, retry=True):
+    """Create an HTTP session; close it (or use it as a context manager) when done."""
+    import requests
+
+    session = requests.Session()
+    session.headers.update(JSON_HEADERS)
+    mount_adapters(session, pool_maxsize, retry)
+    return session
+
+
+def get_session():
+    """Return the shared default HTTP session, creating it on first use."""
+    global _SESSION
+    if _SESSION is None:
+        _SESSION = create_session()
+    return _SESSION
+
 
 def get_api_config(env_file='.env'):
     """Get API host and port from environment or .env file."""
-    # Check environment variables first
-    host = os.environ.get('API_HOST', 'localhost')
-    port = os.environ.get('API_PORT', '5000')
-
-    # If not in environment, try to read from .env file
-    if (host == 'localhost' or port == '5000') and os.path.exists(env_file):
-        with open(env_file, 'r') as f:
-            for line in f:
-                if line.startswith('API_HOST='):
-                    host = line.strip().split('=', 1)[1].strip("'\"")
-                elif line.startswith('API_PORT='):
-                    port = line.strip().split('=', 1)[1].strip("'\"")
-
+    # Environment variables take precedence over the .env file, per key
+    env = load_env(env_file)
+    host = os.environ.get('API_HOST') or env.get('API_HOST') or 'localhost'
+    port = os.environ.get('API_PORT') or env.get('API_PORT') or '5000'
     return host, int(port)
 
 
-def verify_register(host, port, username, password, email=None):
+def verify_register(url, username, password, email=None, session=None):
     """Register a new user by calling the Auth API."""
-    url = f"http://{host}:{port}/api/user/register"
-    headers = {"Content-Type": "application/json"}
+    import json
+    import requests
+
     payload = {
         "username": username,
         "password": password
@@ -50,33 +98,187 @@ def verify_register(host, port, username, password, email=None):
     if email:
         payload["email"] = email
 
+    # Serialize once, compactly, and send the bytes as-is
+    body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
     try:
-        response = requests.post(url, headers=headers, json=payload)
+        response = (session or get_session()).post(url, headers=JSON_HEADERS, data=body)
         return response
     except requests.exceptions.RequestException as e:
         logger.error(f"Request failed: {e}")
         return None
 
 
-def verify_login(host, port, identifier, password):
+def verify_login(url, identifier, password, session=None):
     """Verify login credentials by calling the Auth API."""
-    url = f"http://{host}:{port}/api/user/login"
-    headers = {"Content-Type": "application/json"}
+    import json
+    import requests
+
     payload = {
         "identifier": identifier,
         "password": password
     }
 
+    # Serialize once, compactly, and send the bytes as-is
+    body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
     try:
-        response = requests.post(url, headers=headers, json=payload)
+        response = (session or get_session()).post(url, headers=JSON_HEADERS, data=body)
         return response
     except requests.exceptions.RequestException as e:
         logger.error(f"Login request failed: {e}")
         return None
 
 
-def main():
-    """Main function to parse arguments and verify registration."""
+@functools.lru_cache(maxsize=1)
+def _json_codec():
+    """Return (loads, dumps) backed by orjson when it is installed, else the stdlib json module."""
+    try:
+        import orjson
+    except ImportError:
+        import json
+
+        def dumps(obj, pretty=False):
+            return json.dumps(obj, indent=2 if pretty else None)
+
+        return json.loads, dumps
+
+    def dumps(obj, pretty=False):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0).decode('utf-8')
+
+    return orjson.loads, dumps
+
+
+def _safe_json(response):
+    """Parse a response body as JSON, returning {} for empty or non-JSON bodies."""
+    # Check the raw bytes rather than .text so the body isn't decoded to str just to test emptiness
+    if not response.content:
+        return {}
+    loads, _ = _json_codec()
+    try:
+        # Parse the raw bytes directly, skipping the client's charset detection
+        return loads(response.content)
+    except ValueError:
+        return {}
+
+
+def print_result(kind, response, success_code, success_keys):
+    """Print the outcome of one API call and return True if it succeeded."""
+    if response is None:
+        print(f"{kind} verification failed: Unable to connect to the Auth API.")
+        return False
+
+    status_code = response.status_code
+    data = _safe_json(response)
+    # Pretty-print nested values for people, compact output when piped
+    _, dumps = _json_codec()
+    pretty = sys.stdout.isatty()
+
+    print(f"{kind} Status: {status_code}")
+    if status_code == success_code:
+        print(f"{kind} Result: SUCCESS")
+        for key in success_keys:
+            label = key.replace('_', ' ').title()
+            value = data.get(key, 'N/A')
+            if isinstance(value, (dict, list)):
+                print(f"{label}: {dumps(value, pretty)}")
+            else:
+                print(f"{label}: {value}")
+        return True
+
+    print(f"{kind} Result: FAILED")
+    print(f"Error: {data.get('error', 'Unknown error')}")
+    if 'details' in data:
+        print(f"Details: {dumps(data['details'], pretty)}")
+    return False
+
+
+def load_users_file(file_path):
+    """Load user credentials from a CSV (with header) or JSON list file.
+
+    Raises ValueError for malformed records or duplicate usernames/emails, since
+    duplicates sent concurrently would race each other on the server.
+    """
+    path = Path(file_path)
+    if path.suffix.lower() == '.json':
+        import json
+
+        with open(path, 'r') as f:
+            records = json.load(f)
+        if not isinstance(records, list):
+            raise ValueError("JSON users file must contain a list of user objects")
+    else:
+        with open(path, 'r', newline='') as f:
+            records = list(csv.DictReader(f))
+
+    usernames = set()
+    emails = set()
+    for i, record in enumerate(records, start=1):
+        if not isinstance(record, dict):
+            raise ValueError(f"Record {i}: expected a user object")
+        username = record.get('username')
+        email = record.get('email')
+        if not username or not record.get('password'):
+            raise ValueError(f"Record {i}: username and password are required")
+        if username in usernames:
+            raise ValueError(f"Record {i}: duplicate username '{username}' in file")
+        if email and email in emails:
+            raise ValueError(f"Record {i}: duplicate email '{email}' in file")
+        usernames.add(username)
+        if email:
+            emails.add(email)
+    return records
+
+
+def run_one(register_url, login_url, creds, verify_login_after=False, session=None):
+    """Register one user (and optionally log in), returning (register_status, login_status)."""
+    username = creds.get('username')
+    password = creds.get('password')
+    response = verify_register(register_url, username, password, creds.get('email') or None, session=session)
+    if response is None:
+        return None, None
+
+    login_status = None
+    if verify_login_after and response.status_code == 201:
+        login_response = verify_login(login_url, username, password, session=session)
+        if login_response is not None:
+            login_status = login_response.status_code
+    return response.status_code, login_status
+
+
+def run_batch(register_url, login_url, users, concurrency, verify_login_after=False, session=None):
+    """Register users concurrently and print a compact summary.
+
+    Returns True if every user registered and, with verify_login_after, also logged in.
+    """
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(
+            lambda creds: run_one(register_url, login_url, creds, verify_login_after, session), users
+        ))
+
+    print("\n--- Batch Registration Results ---")
+    registered = 0
+    logged_in = 0
+    for creds, (reg_status, login_status) in zip(users, results):
+        line = f"{creds.get('username')}: register {reg_status or 'NO CONNECTION'}"
+        if verify_login_after and reg_status == 201:
+            line += f", login {login_status or 'NO CONNECTION'}"
+        print(line)
+        if reg_status == 201:
+            registered += 1
+        if login_status == 200:
+            logged_in += 1
+    print(f"Registered: {registered}/{len(users)}")
+    if verify_login_after:
+        print(f"Logged in: {logged_in}/{len(users)}")
+    print("--------------------------------\n")
+    if verify_login_after:
+        return logged_in == len(users)
+    return registered == len(users)
+
+
+def main(argv=None):
+    """Main function to parse arguments and verify registration; returns the exit status."""
     parser = argparse.ArgumentParser(description='Verify user registration against the Auth API.')
 
     # API connection options
@@ -98,13 +300,11 @@ def main():
     # Registration details
     parser.add_argument(
         '-u', '--username',
-        required=True,
-        help='Username for registration'
+        help='Username for registration (required unless --users-file is given)'
     )
     parser.add_argument(
         '-p', '--password',
-        required=True,
-        help='Password for registration'
+        help='Password for registration (required unless --users-file is given)'
     )
     parser.add_argument(
         '-e', '--email',
@@ -117,71 +317,81 @@ def main():
         action='store_true',
         help='Verify login after successful registration'
     )
+    parser.add_argument(
+        '--users-file',
+        help='CSV (with header) or JSON list of users to register instead of -u/-p'
+    )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=8,
+        help='Number of concurrent requests when using --users-file (default: 8)'
+    )
+    parser.add_argument(
+        '--no-retry',
+        action='store_true',
+        help='Disable automatic retries of connection errors and 502/503/504 responses'
+    )
+
+    args = parser.parse_args(argv)
 
-    args = parser.parse_args()
+    if not args.users_file and not (args.username and args.password):
+        parser.error("--username and --password are required unless --users-file is given")
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
 
     # Get API configuration
     default_host, default_port = get_api_config(args.env_file)
     host = args.host or default_host
     port = args.port or default_port
 
-    # Register user
-    logger.info(f"Registering user {args.username} at {host}:{port}...")
-    response = verify_register(host, port, args.username, args.password, args.email)
+    # Endpoints are fixed for the whole run, so build them once
+    register_url = f"http://{host}:{port}/api/user/register"
+    login_url = f"http://{host}:{port}/api/user/login"
 
-    if not response:
-        logger.error("Failed to connect to the Auth API.")
-        sys.exit(1)
+    users = None
+    if args.users_file:
+        try:
+            users = load_users_file(args.users_file)
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to read users file: {e}")
+            return 1
 
-    # Display results
-    status_code = response.status_code
-    response_data = response.json() if response.text else {}
+    # Size the connection pool so every batch worker keeps its own keep-alive connection
+    pool_maxsize = max(20, args.concurrency) if users is not None else 20
+
+    # A session per run keeps main() re-entrant and releases pooled sockets on every exit path
+    with create_session(pool_maxsize, retry=not args.no_retry) as session:
+        if users is not None:
+            logger.info(f"Registering {len(users)} users at {host}:{port} with concurrency {args.concurrency}...")
+            all_succeeded = run_batch(
+                register_url, login_url, users, args.concurrency, args.verify_login, session=session
+            )
+            return 0 if all_succeeded else 1
+
+        # Register user
+        logger.info(f"Registering user {args.username} at {host}:{port}...")
+        response = verify_register(register_url, args.username, args.password, args.email, session=session)
 
-    print("\n--- Registration Verification Results ---")
-    print(f"Status: {status_code}")
+        # A 4xx/5xx Response is falsy, so test for a missing response explicitly
+        if response is None:
+            logger.error("Failed to connect to the Auth API.")
+            return 1
 
-    if status_code == 201:
-        print(f"Result: SUCCESS")
-        print(f"Message: {response_data.get('message', 'N/A')}")
+        print("\n--- Registration Verification Results ---")
+        registered = print_result("Registration", response, 201, ("message", "user"))
 
-        # Print user details if available
-        if 'user' in response_data:
-            print("\nUser Details:")
-            print(json.dumps(response_data['user'], indent=2))
+        succeeded = registered
 
         # Verify login if requested
-        if args.verify_login:
+        if registered and args.verify_login:
             print("\n--- Verifying Login with New Credentials ---")
-            identifier = args.username
-            password = args.password
-
-            login_response = verify_login(host, port, identifier, password)
-
-            if login_response:
-                login_status = login_response.status_code
-                login_data = login_response.json() if login_response.text else {}
-
-                print(f"Login Status: {login_status}")
-
-                if login_status == 200:
-                    print(f"Login Result: SUCCESS")
-                    print(f"Access Token: {login_data.get('access_token', 'N/A')}")
-                    print(f"Token Type: {login_data.get('token_type', 'N/A')}")
-                else:
-                    print(f"Login Result: FAILED")
-                    print(f"Error: {login_data.get('error', 'Unknown error')}")
-                    if 'details' in login_data:
-                        print(f"Details: {json.dumps(login_data['details'], indent=2)}")
-            else:
-                print("Login verification failed: Unable to connect to the Auth API.")
-    else:
-        print(f"Result: FAILED")
-        print(f"Error: {response_data.get('error', 'Unknown error')}")
-        if 'details' in response_data:
-            print(f"Details: {json.dumps(response_data['details'], indent=2)}")
+            login_response = verify_login(login_url, args.username, args.password, session=session)
+            succeeded = print_result("Login", login_response, 200, ("access_token", "token_type"))
 
-    print("--------------------------------\n")
+        print("--------------------------------\n")
+    return 0 if succeeded else 1
 
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())